@@ -1,7 +1,11 @@
 import os
-from flask import Flask, request, redirect, url_for, render_template, flash
+import sqlite3
+from flask import Flask, request, redirect, url_for, render_template, flash, g
 from data_manager import DataManager
 from models import db, Movie
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
 
 app = Flask(__name__)
 
@@ -12,10 +16,32 @@ app.config['SECRET_KEY'] = 'your-secret-key-here'  # Change this to a random sec
 basedir = os.path.abspath(os.path.dirname(__file__))
 app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(basedir, 'data/movies.db')}"
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Keep a bounded pool of open connections so worker threads reuse them
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'poolclass': QueuePool,
+    'pool_size': 8,
+    'max_overflow': 4,
+    'connect_args': {'check_same_thread': False},
+}
 
 # Link the database and the app
 db.init_app(app)
 
+
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Enable WAL mode and tune SQLite for faster commits on every new connection."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-64000")  # ~64 MB page cache
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB memory-mapped I/O
+    cursor.close()
+
+
 # Create an object of DataManager class
 data_manager = DataManager()
 
@@ -45,8 +71,7 @@ def validate_movie_input(title):
 def get_user_by_id(user_id):
     """Get user by ID with proper error handling."""
     try:
-        users = data_manager.get_users()
-        user = next((u for u in users if u.id == user_id), None)
+        user = data_manager.get_user(user_id)
         if not user:
             raise ValueError(f"User with ID {user_id} not found")
         return user
@@ -54,19 +79,22 @@ def get_user_by_id(user_id):
         raise Exception(f"Error fetching user: {str(e)}")
 
 
+def get_all_users():
+    """Get all users, fetching them at most once per request."""
+    if 'users' not in g:
+        g.users = data_manager.get_users()
+    return g.users
+
+
 @app.route('/')
 def index():
     """Home page showing all users and form for adding new users."""
-    users = data_manager.get_users()
-    
-    # Calculate movie counts for each user and total
-    user_movie_counts = {}
-    total_movies = 0
+    users = get_all_users()
     
-    for user in users:
-        movie_count = len(data_manager.get_movies(user.id))
-        user_movie_counts[user.id] = movie_count
-        total_movies += movie_count
+    # Calculate movie counts for each user and total in one query
+    movie_counts = data_manager.get_movie_counts()
+    user_movie_counts = {user.id: movie_counts.get(user.id, 0) for user in users}
+    total_movies = sum(user_movie_counts.values())
     
     return render_template('index.html', 
                          users=users, 
@@ -83,8 +111,7 @@ def create_user():
         name = validate_user_input(raw_name)
         
         # Check if user already exists
-        existing_users = data_manager.get_users()
-        if any(user.name.lower() == name.lower() for user in existing_users):
+        if data_manager.user_name_exists(name):
             flash(f'User "{name}" already exists!', 'error')
             return redirect(url_for('index'))
         
@@ -135,11 +162,14 @@ def add_movie(user_id):
         title = validate_movie_input(raw_title)
         
         # Check if movie already exists for this user
-        existing_movies = data_manager.get_movies(user_id)
-        if any(movie.title.lower() == title.lower() for movie in existing_movies):
+        if data_manager.movie_title_exists(user_id, title):
             flash(f'Movie "{title}" is already in your collection!', 'error')
             return redirect(url_for('get_movies', user_id=user_id))
         
+        # End the read-only transaction from the checks above so no database
+        # connection is held while add_movie waits on OMDb
+        db.session.commit()
+        
         # Add the movie
         movie = data_manager.add_movie(title, user_id)
         if movie:
@@ -194,10 +224,9 @@ def delete_movie(user_id, movie_id):
         user = get_user_by_id(user_id)
         
         # Get movie title before deletion for the flash message
-        movies = data_manager.get_movies(user_id)
-        movie = next((m for m in movies if m.id == movie_id), None)
+        movie = data_manager.get_movie(movie_id)
         
-        if not movie:
+        if not movie or movie.user_id != user_id:
             flash('Movie not found!', 'error')
             return redirect(url_for('get_movies', user_id=user_id))
         
@@ -223,8 +252,7 @@ def delete_movie(user_id, movie_id):
 def delete_user(user_id):
     """Delete a user and all their movies."""
     try:
-        users = data_manager.get_users()
-        user = next((u for u in users if u.id == user_id), None)
+        user = data_manager.get_user(user_id)
         
         if not user:
             flash('User not found!', 'error')
@@ -233,9 +261,7 @@ def delete_user(user_id):
         user_name = user.name
         
         # Delete all movies for this user first
-        movies = data_manager.get_movies(user_id)
-        for movie in movies:
-            data_manager.delete_movie(movie.id)
+        data_manager.delete_user_movies(user_id)
         
         # Delete the user (Note: This would require adding delete_user method to DataManager)
         # For now, we'll just show a message
@@ -247,6 +273,21 @@ def delete_user(user_id):
     return redirect(url_for('index'))
 
 
+@app.after_request
+def add_conditional_get(response):
+    """
+    Tag rendered pages with a content-hash ETag so unchanged pages are answered
+    with 304 Not Modified. The page is still queried and rendered on every request;
+    only the response body is saved.
+    """
+    if request.method == 'GET' and response.status_code == 200 and response.mimetype == 'text/html':
+        # Browsers must revalidate, so new data and flash messages show up immediately
+        response.headers['Cache-Control'] = 'no-cache'
+        response.add_etag()
+        response.make_conditional(request)
+    return response
+
+
 @app.errorhandler(404)
 def page_not_found(error):
     """Handle 404 errors with a custom page."""
@@ -1,11 +1,18 @@
+import functools
 import os
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 from models import db, User, Movie
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Maximum number of OMDb lookups kept in memory
+OMDB_CACHE_SIZE = 4096
+
 
 class DataManager:
     """
@@ -17,6 +24,29 @@ class DataManager:
         """Initialize DataManager with OMDb API configuration."""
         self.omdb_api_key = os.getenv('OMDB_API_KEY')
         self.omdb_base_url = os.getenv('OMDB_BASE_URL', 'http://www.omdbapi.com/')
+        
+        # Reuse one HTTP session so OMDb connections are kept alive between requests
+        self.session = requests.Session()
+        # Only retry failed connects; retrying read timeouts would multiply the 10s timeout
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=2, connect=2, read=0, backoff_factor=0.2)
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = 'MoviWeb/1.0'
+        
+        # Pre-bind the OMDb endpoint and fixed parameters; each lookup only adds the title
+        self._omdb_get = functools.partial(self.session.get, self.omdb_base_url, timeout=10)
+        self._omdb_base_params = {
+            'apikey': self.omdb_api_key,
+            'plot': 'short'  # Get short plot summary
+        }
+        
+        # Extracted OMDb details keyed by normalized title
+        self._movie_details_cache = {}
+        self._movie_details_lock = threading.Lock()
     
     def fetch_movie_data(self, title):
         """
@@ -33,15 +63,8 @@ class DataManager:
             return None
         
         try:
-            # Prepare API request parameters
-            params = {
-                'apikey': self.omdb_api_key,
-                't': title,  # Search by title
-                'plot': 'short'  # Get short plot summary
-            }
-            
-            # Make API request
-            response = requests.get(self.omdb_base_url, params=params, timeout=10)
+            # Make API request, searching by title
+            response = self._omdb_get(params={**self._omdb_base_params, 't': title})
             response.raise_for_status()  # Raise exception for bad status codes
             
             data = response.json()
@@ -60,6 +83,55 @@ class DataManager:
             print(f"Unexpected error: {e}")
             return None
     
+    def get_movie_details(self, title):
+        """
+        Return the movie details used by the app, caching successful OMDb lookups.
+        
+        Args:
+            title (str): The title of the movie to search for
+        
+        Returns:
+            tuple: (title, year, rating, genre) from OMDb, or None if not found or error occurred
+        """
+        key = title.strip().lower()
+        with self._movie_details_lock:
+            if key in self._movie_details_cache:
+                return self._movie_details_cache[key]
+        
+        omdb_data = self.fetch_movie_data(title)
+        if not omdb_data:
+            # Don't cache misses, they may be caused by transient network errors
+            return None
+        
+        # Extract data from OMDb response and convert to appropriate types
+        year = None
+        if omdb_data.get('Year') and omdb_data['Year'] != 'N/A':
+            try:
+                year = int(omdb_data['Year'])
+            except (ValueError, TypeError):
+                year = None
+        
+        rating = None
+        if omdb_data.get('imdbRating') and omdb_data['imdbRating'] != 'N/A':
+            try:
+                rating = float(omdb_data['imdbRating'])
+            except (ValueError, TypeError):
+                rating = None
+        
+        genre = omdb_data.get('Genre', None)
+        if genre == 'N/A':
+            genre = None
+        
+        # Use OMDb title or fallback to search title
+        details = (omdb_data.get('Title', title), year, rating, genre)
+        
+        # Evict the oldest entry once the cache is full
+        with self._movie_details_lock:
+            if len(self._movie_details_cache) >= OMDB_CACHE_SIZE:
+                self._movie_details_cache.pop(next(iter(self._movie_details_cache)), None)
+            self._movie_details_cache[key] = details
+        return details
+    
     def create_user(self, name):
         """
         Add a new user to the database.
@@ -84,6 +156,32 @@ class DataManager:
         """
         return User.query.all()
     
+    def user_name_exists(self, name):
+        """
+        Check whether a user with the given name already exists (case-insensitive).
+        
+        Args:
+            name (str): The user name to look for
+        
+        Returns:
+            bool: True if a matching user exists, False otherwise
+        """
+        return db.session.query(
+            db.exists().where(db.func.py_lower(User.name) == name.lower())
+        ).scalar()
+    
+    def get_user(self, user_id):
+        """
+        Return a single user by primary key.
+        
+        Args:
+            user_id (int): The ID of the user to retrieve
+        
+        Returns:
+            User: The User object, or None if not found
+        """
+        return db.session.get(User, user_id)
+    
     def get_movies(self, user_id):
         """
         Return a list of all movies for a specific user.
@@ -94,7 +192,57 @@ class DataManager:
         Returns:
             list: List of Movie objects belonging to the user
         """
-        return Movie.query.filter_by(user_id=user_id).all()
+        # Only load the columns the movie list displays
+        return (
+            Movie.query
+            .options(db.load_only(Movie.id, Movie.title, Movie.year, Movie.rating, Movie.genre))
+            .filter_by(user_id=user_id)
+            .all()
+        )
+    
+    def movie_title_exists(self, user_id, title):
+        """
+        Check whether a user already has a movie with the given title (case-insensitive).
+        
+        Args:
+            user_id (int): The ID of the user whose movies to check
+            title (str): The movie title to look for
+        
+        Returns:
+            bool: True if a matching movie exists, False otherwise
+        """
+        return db.session.query(
+            db.exists().where(
+                Movie.user_id == user_id,
+                db.func.py_lower(Movie.title) == title.lower()
+            )
+        ).scalar()
+    
+    def get_movie(self, movie_id):
+        """
+        Return a single movie by primary key.
+        
+        Args:
+            movie_id (int): The ID of the movie to retrieve
+        
+        Returns:
+            Movie: The Movie object, or None if not found
+        """
+        return db.session.get(Movie, movie_id)
+    
+    def get_movie_counts(self):
+        """
+        Return the number of movies for every user in a single query.
+        
+        Returns:
+            dict: Mapping of user ID to movie count (users without movies are omitted)
+        """
+        rows = (
+            db.session.query(Movie.user_id, db.func.count(Movie.id))
+            .group_by(Movie.user_id)
+            .all()
+        )
+        return dict(rows)
     
     def add_movie(self, title, user_id):
         """
@@ -107,49 +255,49 @@ class DataManager:
         Returns:
             Movie: The created movie object with OMDb data, or None if movie not found
         """
-        # Fetch movie data from OMDb API
-        omdb_data = self.fetch_movie_data(title)
+        # Fetch movie details from OMDb API (or the in-memory cache)
+        details = self.get_movie_details(title)
         
-        if not omdb_data:
+        if not details:
             # If OMDb data not available, create movie with just title
             new_movie = Movie(
                 title=title,
                 user_id=user_id
             )
         else:
-            # Extract data from OMDb response and convert to appropriate types
-            year = None
-            if omdb_data.get('Year') and omdb_data['Year'] != 'N/A':
-                try:
-                    year = int(omdb_data['Year'])
-                except (ValueError, TypeError):
-                    year = None
-            
-            rating = None
-            if omdb_data.get('imdbRating') and omdb_data['imdbRating'] != 'N/A':
-                try:
-                    rating = float(omdb_data['imdbRating'])
-                except (ValueError, TypeError):
-                    rating = None
-            
-            genre = omdb_data.get('Genre', None)
-            if genre == 'N/A':
-                genre = None
+            omdb_title, year, rating, genre = details
             
             # Create movie object with OMDb data
             new_movie = Movie(
-                title=omdb_data.get('Title', title),  # Use OMDb title or fallback to search title
+                title=omdb_title,
                 year=year,
                 genre=genre,
                 rating=rating,
                 user_id=user_id
             )
         
-        # Save to database
+        # Save to database in a single transaction with one commit
         db.session.add(new_movie)
         db.session.commit()
         return new_movie
     
+    def bulk_add_movies(self, rows):
+        """
+        Insert many movies at once using a single statement and one commit.
+        Prefer this over calling add_movie() in a loop when importing or seeding data.
+        
+        Args:
+            rows (list): List of dicts with Movie column values (title and user_id required)
+        
+        Returns:
+            int: The number of movies inserted
+        """
+        if not rows:
+            return 0
+        db.session.execute(db.insert(Movie), rows)
+        db.session.commit()
+        return len(rows)
+    
     def add_movie_object(self, movie):
         """
         Add a Movie object directly to the database (for backward compatibility).
@@ -192,9 +340,23 @@ class DataManager:
         Returns:
             bool: True if deletion was successful, False if movie not found
         """
-        movie = Movie.query.get(movie_id)
+        movie = self.get_movie(movie_id)
         if movie:
             db.session.delete(movie)
             db.session.commit()
             return True
-        return False
\ No newline at end of file
+        return False
+    
+    def delete_user_movies(self, user_id):
+        """
+        Delete all movies belonging to a user in a single statement.
+        
+        Args:
+            user_id (int): The ID of the user whose movies to delete
+        
+        Returns:
+            int: The number of movies deleted
+        """
+        deleted = Movie.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
\ No newline at end of file
@@ -1,8 +1,25 @@
+import sqlite3
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 db = SQLAlchemy()
 
 
+def py_lower(value):
+    """Lowercase text the same way Python's str.lower() does (SQLite's lower() is ASCII-only)."""
+    return value.lower() if isinstance(value, str) else value
+
+
+@event.listens_for(Engine, "connect")
+def register_sqlite_functions(dbapi_connection, connection_record):
+    """Register py_lower() on every SQLite connection; the Movie title index depends on it."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    # Must be deterministic so it can back an expression index
+    dbapi_connection.create_function("py_lower", 1, py_lower, deterministic=True)
+
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -16,4 +33,9 @@ class Movie(db.Model):
     rating = db.Column(db.Float, nullable=True)
     
     # Link Movie to User
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
\ No newline at end of file
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    
+    # Serves per-user movie lookups and case-insensitive duplicate checks
+    __table_args__ = (
+        db.Index('ix_movie_user_title_py_lower', user_id, db.func.py_lower(title)),
+    )
\ No newline at end of file